@@ -104,12 +104,13 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'receipts.renderers.ORJSONRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
         'rest_framework.parsers.MultiPartParser',
     ],
+    'EXCEPTION_HANDLER': 'receipts.exceptions.handler',
 }
 
 # CORS settings
@@ -121,11 +122,53 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_ALL_ORIGINS = True
 
 # File upload settings
+# Spool uploads to a temp file so they're streamed to storage instead of held in memory
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+]
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 
+# Cache (file-based so cached Gemini results survive restarts)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+    }
+}
+
+# Celery (background OCR + AI processing)
+# Run tasks inline (no broker or worker needed) when set, e.g. for local development
+CELERY_TASK_ALWAYS_EAGER = os.environ.get('CELERY_TASK_ALWAYS_EAGER', 'False') == 'True'
+CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+# Eager mode keeps task results in the Django process's memory so it doesn't need Redis either
+CELERY_RESULT_BACKEND = os.environ.get(
+    'CELERY_RESULT_BACKEND',
+    'cache+memory://' if CELERY_TASK_ALWAYS_EAGER else 'redis://localhost:6379/0'
+)
+CELERY_TASK_STORE_EAGER_RESULT = True  # so the status endpoint also works in eager mode
+CELERY_TASK_ROUTES = {'receipts.tasks.*': {'queue': 'receipts'}}
+# Tasks run in threads so they share the process-wide OCR pool (prefork children can't spawn it)
+CELERY_WORKER_POOL = 'threads'
+
 # Gemini API Configuration
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', 'your-gemini-api-key-here')
+GEMINI_CACHE_TIMEOUT = 60 * 60 * 24 * 30  # 30 days
+
+# OCR Configuration
+# Worker processes used to render + OCR pages in parallel (leave one core for the web worker)
+OCR_MAX_WORKERS = int(os.environ.get('OCR_MAX_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+# PDFs whose embedded text layer has more characters than this skip OCR entirely
+OCR_TEXT_LAYER_MIN_CHARS = int(os.environ.get('OCR_TEXT_LAYER_MIN_CHARS', 200))
+# Tesseract tuning for English receipts; override OCR_LANG / OCR_CHAR_WHITELIST for other scripts
+OCR_LANG = os.environ.get('OCR_LANG', 'eng')
+OCR_DPI = int(os.environ.get('OCR_DPI', 300))
+OCR_PSM = int(os.environ.get('OCR_PSM', 6))
+OCR_CHAR_WHITELIST = os.environ.get(
+    'OCR_CHAR_WHITELIST',
+    '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz.,:/#$@&-() '
+)
 
 # Create media directory if it doesn't exist
 os.makedirs(MEDIA_ROOT, exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,37 @@
+import logging
+from django.http import Http404
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+
+logger = logging.getLogger(__name__)
+
+
+def handler(exc, context):
+    """
+    Turn exceptions raised in the API views into JSON error responses.
+    
+    DRF exceptions (NotFound, ParseError, ...) keep their status code, with their
+    message returned under 'error' like the rest of the API. Serializer validation
+    errors keep their per-field layout. Anything else is logged and reported as a
+    generic 500 without exposing internals.
+    """
+    # Keep get_object_or_404's message (e.g. "No Receipt matches the given query.")
+    if isinstance(exc, Http404):
+        exc = NotFound(str(exc) or None)
+    
+    response = exception_handler(exc, context)
+    
+    if response is None:
+        request = context.get('request')
+        path = request.path if request is not None else 'unknown path'
+        logger.error(f"Unhandled error on {path}: {str(exc)}", exc_info=exc)
+        return Response({
+            'error': 'Internal server error'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    if isinstance(response.data, dict) and set(response.data) == {'detail'}:
+        response.data = {'error': response.data['detail']}
+    
+    return response
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.7 on 2026-10-15 21:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Receipt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('purchased_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('merchant_name', models.CharField(blank=True, db_index=True, max_length=255)),
+                ('total_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('file_path', models.CharField(max_length=500)),
+                ('subtotal', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('tax_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('tip_amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('payment_method', models.CharField(blank=True, max_length=50)),
+                ('receipt_number', models.CharField(blank=True, max_length=100)),
+                ('cashier', models.CharField(blank=True, max_length=100)),
+                ('raw_text', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'receipt',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReceiptItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_name', models.CharField(max_length=255)),
+                ('quantity', models.DecimalField(decimal_places=2, default=1, max_digits=10)),
+                ('unit_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('total_price', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('receipt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='receipts.receipt')),
+            ],
+            options={
+                'db_table': 'receipt_item',
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReceiptFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255)),
+                ('file_path', models.CharField(max_length=500)),
+                ('is_valid', models.BooleanField(db_index=True, default=False)),
+                ('invalid_reason', models.TextField(blank=True, null=True)),
+                ('is_processed', models.BooleanField(db_index=True, default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'receipt_file',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['-created_at'], name='receipt_fil_created_6567d7_idx'), models.Index(fields=['is_processed', 'is_valid'], name='receipt_fil_is_proc_893dfa_idx')],
+            },
+        ),
+        migrations.AddField(
+            model_name='receipt',
+            name='receipt_file',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='receipts.receiptfile'),
+        ),
+        migrations.AddIndex(
+            model_name='receipt',
+            index=models.Index(fields=['-created_at'], name='receipt_created_8f68ef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='receipt',
+            index=models.Index(fields=['receipt_file', '-created_at'], name='receipt_receipt_d797a6_idx'),
+        ),
+    ]
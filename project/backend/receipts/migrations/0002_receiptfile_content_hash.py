@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-15 21:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('receipts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receiptfile',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
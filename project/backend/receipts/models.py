@@ -7,15 +7,20 @@ class ReceiptFile(models.Model):
     
     file_name = models.CharField(max_length=255)
     file_path = models.CharField(max_length=500)
-    is_valid = models.BooleanField(default=False)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)  # SHA-256 of the file bytes
+    is_valid = models.BooleanField(default=False, db_index=True)
     invalid_reason = models.TextField(blank=True, null=True)
-    is_processed = models.BooleanField(default=False)
+    is_processed = models.BooleanField(default=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'receipt_file'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['is_processed', 'is_valid']),
+        ]
     
     def __str__(self):
         return self.file_name
@@ -24,8 +29,8 @@ class ReceiptFile(models.Model):
 class Receipt(models.Model):
     """Model for storing extracted receipt information."""
     
-    purchased_at = models.DateTimeField(null=True, blank=True)
-    merchant_name = models.CharField(max_length=255, blank=True)
+    purchased_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    merchant_name = models.CharField(max_length=255, blank=True, db_index=True)
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     file_path = models.CharField(max_length=500)
     
@@ -55,6 +60,10 @@ class Receipt(models.Model):
     class Meta:
         db_table = 'receipt'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at']),
+            models.Index(fields=['receipt_file', '-created_at']),
+        ]
     
     def __str__(self):
         return f"{self.merchant_name} - ${self.total_amount}"
@@ -0,0 +1,14 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ReceiptPagination(CursorPagination):
+    """
+    Cursor pagination for the receipt and receipt file listings.
+    
+    Pages are fetched by seeking on the created_at index rather than with an
+    OFFSET, so deep pages cost the same as the first one.
+    """
+    ordering = '-created_at'
+    page_size = 100
+    page_size_query_param = 'limit'
+    max_page_size = 1000
@@ -0,0 +1,14 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSON renderer backed by orjson, falling back to DRF's encoder for types orjson doesn't know."""
+    
+    _encoder = JSONEncoder()
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=self._encoder.default)
@@ -1,8 +1,52 @@
+from collections import OrderedDict
+from operator import attrgetter
+from django.utils.functional import cached_property
 from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
 from .models import ReceiptFile, Receipt, ReceiptItem
 
 
-class ReceiptItemSerializer(serializers.ModelSerializer):
+class FastModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that resolves how to read each field once per serializer instance.
+    
+    Plain model columns are read with a precomputed attrgetter instead of DRF's
+    per-row get_attribute walk (Mapping check, is_simple_callable, ...). With many=True
+    the child serializer is shared across rows, so the lookup is paid once per list.
+    """
+    
+    @cached_property
+    def _field_getters(self):
+        column_names = {
+            f.name for f in self.Meta.model._meta.concrete_fields if not f.is_relation
+        }
+        getters = []
+        for field in self._readable_fields:
+            if len(field.source_attrs) == 1 and field.source_attrs[0] in column_names:
+                getter = attrgetter(field.source_attrs[0])
+            else:
+                getter = field.get_attribute
+            getters.append((field.field_name, getter, field))
+        return getters
+    
+    def to_representation(self, instance):
+        ret = OrderedDict()
+        for field_name, getter, field in self._field_getters:
+            try:
+                attribute = getter(instance)
+            except SkipField:
+                continue
+            
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            if check_for_none is None:
+                ret[field_name] = None
+            else:
+                ret[field_name] = field.to_representation(attribute)
+        return ret
+
+
+class ReceiptItemSerializer(FastModelSerializer):
     """Serializer for receipt items."""
     
     class Meta:
@@ -10,8 +54,12 @@ class ReceiptItemSerializer(serializers.ModelSerializer):
         fields = ['id', 'item_name', 'quantity', 'unit_price', 'total_price']
 
 
-class ReceiptSerializer(serializers.ModelSerializer):
-    """Serializer for receipts."""
+class ReceiptSerializer(FastModelSerializer):
+    """
+    Serializer for receipts.
+    
+    Querysets serialized with many=True should prefetch 'items' to avoid one query per receipt.
+    """
     
     items = ReceiptItemSerializer(many=True, read_only=True)
     
@@ -25,10 +73,22 @@ class ReceiptSerializer(serializers.ModelSerializer):
         ]
 
 
-class ReceiptFileSerializer(serializers.ModelSerializer):
-    """Serializer for receipt files."""
+class ReceiptListSerializer(ReceiptSerializer):
+    """Serializer for receipts without the (potentially large) raw OCR text, used unless it is asked for."""
     
-    receipts = ReceiptSerializer(many=True, read_only=True)
+    class Meta(ReceiptSerializer.Meta):
+        fields = [f for f in ReceiptSerializer.Meta.fields if f != 'raw_text']
+
+
+class ReceiptFileSerializer(FastModelSerializer):
+    """
+    Serializer for receipt files.
+    
+    Querysets serialized with many=True should prefetch 'receipts' and 'receipts__items'
+    to avoid one query per file and per receipt.
+    """
+    
+    receipts = ReceiptListSerializer(many=True, read_only=True)
     
     class Meta:
         model = ReceiptFile
@@ -44,7 +104,7 @@ class FileUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
     
     def validate_file(self, value):
-        """Validate that the uploaded file is a PDF."""
+        """Validate that the uploaded file is a PDF (by extension, size and magic bytes)."""
         if not value.name.lower().endswith('.pdf'):
             raise serializers.ValidationError("Only PDF files are allowed.")
         
@@ -52,4 +112,10 @@ class FileUploadSerializer(serializers.Serializer):
         if value.size > 10 * 1024 * 1024:
             raise serializers.ValidationError("File size cannot exceed 10MB.")
         
+        # Sniff the header so non-PDF content is rejected before it reaches the PDF renderer
+        head = value.read(5)
+        value.seek(0)
+        if head != b'%PDF-':
+            raise serializers.ValidationError("File is not a valid PDF (bad magic bytes).")
+        
         return value
\ No newline at end of file
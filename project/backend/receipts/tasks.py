@@ -0,0 +1,112 @@
+import logging
+from celery import shared_task
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from .models import ReceiptFile, Receipt, ReceiptItem
+from .utils import extract_text_from_pdf, parse_receipt_text
+
+logger = logging.getLogger(__name__)
+
+
+# Receipt columns carried over when reusing results for a duplicate upload
+_RECEIPT_COPY_FIELDS = [
+    'purchased_at', 'merchant_name', 'total_amount', 'subtotal', 'tax_amount',
+    'tip_amount', 'payment_method', 'receipt_number', 'cashier', 'raw_text'
+]
+_ITEM_COPY_FIELDS = ['item_name', 'quantity', 'unit_price', 'total_price']
+
+
+def clone_receipt(source, receipt_file):
+    """Copy a processed receipt and its items onto another receipt file."""
+    receipt = Receipt.objects.create(
+        file_path=receipt_file.file_path,
+        receipt_file=receipt_file,
+        **{field: getattr(source, field) for field in _RECEIPT_COPY_FIELDS}
+    )
+    ReceiptItem.objects.bulk_create([
+        ReceiptItem(receipt=receipt, **{field: getattr(item, field) for field in _ITEM_COPY_FIELDS})
+        for item in source.items.all()
+    ], batch_size=500)
+    return receipt
+
+
+def mark_processed(receipt_file):
+    """Flag a receipt file as processed with a single UPDATE statement."""
+    # update() bypasses auto_now, so updated_at is set explicitly
+    ReceiptFile.objects.filter(pk=receipt_file.pk).update(is_processed=True, updated_at=timezone.now())
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=10)
+def process_receipt_file(self, receipt_file_id):
+    """Extract receipt details from an uploaded file using OCR/AI and store them."""
+    try:
+        receipt_file = ReceiptFile.objects.only('id', 'file_path', 'content_hash').get(id=receipt_file_id)
+    except ReceiptFile.DoesNotExist:
+        logger.error(f"Receipt file {receipt_file_id} not found")
+        return {'error': 'Receipt file not found'}
+    
+    try:
+        # Identical file already processed: copy its results instead of running OCR again
+        if receipt_file.content_hash:
+            existing = Receipt.objects.filter(
+                receipt_file__content_hash=receipt_file.content_hash
+            ).exclude(receipt_file=receipt_file).prefetch_related('items').first()
+            if existing is not None:
+                logger.info(f"Reusing receipt {existing.id} for duplicate file {receipt_file_id}")
+                with transaction.atomic():
+                    receipt = clone_receipt(existing, receipt_file)
+                    mark_processed(receipt_file)
+                return {'receipt_id': receipt.id}
+        
+        # Extract text from PDF
+        try:
+            with default_storage.open(receipt_file.file_path, 'rb') as pdf_file:
+                extracted_text = extract_text_from_pdf(pdf_file)
+        except FileNotFoundError:
+            logger.error(f"Receipt file {receipt_file_id} is missing from storage")
+            return {'error': 'Receipt file is missing from storage'}
+        
+        if not extracted_text:
+            logger.error(f"Failed to extract text from receipt file {receipt_file_id}")
+            return {'error': 'Failed to extract text from PDF'}
+        
+        # Parse receipt information
+        receipt_data = parse_receipt_text(extracted_text)
+        
+        # Store the receipt, its items and the processed flag in one transaction
+        with transaction.atomic():
+            receipt = Receipt.objects.create(
+                purchased_at=receipt_data.get('purchased_at'),
+                merchant_name=receipt_data.get('merchant_name', ''),
+                total_amount=receipt_data.get('total_amount'),
+                subtotal=receipt_data.get('subtotal'),
+                tax_amount=receipt_data.get('tax_amount'),
+                tip_amount=receipt_data.get('tip_amount'),
+                payment_method=receipt_data.get('payment_method', ''),
+                receipt_number=receipt_data.get('receipt_number', ''),
+                cashier=receipt_data.get('cashier', ''),
+                raw_text=extracted_text,
+                file_path=receipt_file.file_path,
+                receipt_file=receipt_file
+            )
+            
+            # Create receipt items with a single multi-row INSERT
+            ReceiptItem.objects.bulk_create([
+                ReceiptItem(
+                    receipt=receipt,
+                    item_name=item_data.get('name', ''),
+                    quantity=item_data.get('quantity', 1),
+                    unit_price=item_data.get('unit_price'),
+                    total_price=item_data.get('total_price')
+                )
+                for item_data in receipt_data.get('items', [])
+            ], batch_size=500)
+            
+            mark_processed(receipt_file)
+        
+        return {'receipt_id': receipt.id}
+    
+    except Exception as e:
+        logger.error(f"Error processing receipt file {receipt_file_id}: {str(e)}")
+        raise self.retry(exc=e)
@@ -3,10 +3,14 @@ from . import views
 
 urlpatterns = [
     path('upload/', views.upload_receipt, name='upload_receipt'),
+    path('upload-and-process/', views.upload_and_process_receipt, name='upload_and_process_receipt'),
     path('validate/', views.validate_receipt, name='validate_receipt'),
     path('process/', views.process_receipt, name='process_receipt'),
     path('receipts/', views.list_receipts, name='list_receipts'),
+    path('receipts/export/', views.export_receipts, name='export_receipts'),
     path('receipts/<int:receipt_id>/', views.get_receipt, name='get_receipt'),
+    path('receipts/status/<str:task_id>/', views.get_processing_status, name='get_processing_status'),
     path('receipt-files/', views.list_receipt_files, name='list_receipt_files'),
+    path('receipt-files/<int:file_id>/', views.get_receipt_file, name='get_receipt_file'),
     path('health/', views.health_check, name='health_check'),
 ]
\ No newline at end of file
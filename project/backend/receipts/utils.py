@@ -1,46 +1,207 @@
 import os
 import re
-import json
+import time
+import random
+import hashlib
 import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from decimal import Decimal, InvalidOperation
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import BinaryIO, Dict, List, Optional, Tuple
+from dateutil import parser as dateparser
+import orjson
+import fitz
 import pytesseract
 from PIL import Image
-from pdf2image import convert_from_path
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
 from django.conf import settings
+from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 
 # Configure Gemini API
 genai.configure(api_key=settings.GEMINI_API_KEY)
 
+# Build the Gemini model once per process; None when no real API key is configured
+if settings.GEMINI_API_KEY and settings.GEMINI_API_KEY != 'your-gemini-api-key-here':
+    _GEMINI_MODEL = genai.GenerativeModel('gemini-pro')
+else:
+    _GEMINI_MODEL = None
 
-def validate_pdf(file_path: str) -> Tuple[bool, Optional[str]]:
+# Tesseract config: LSTM engine only, uniform text block, whitelist to shrink the classifier search
+_TESSERACT_CONFIG = f'--oem 1 --psm {settings.OCR_PSM} -c preserve_interword_spaces=1'
+if settings.OCR_CHAR_WHITELIST:
+    _TESSERACT_CONFIG += f' -c tessedit_char_whitelist="{settings.OCR_CHAR_WHITELIST}"'
+
+# Shared OCR worker pool, see _get_ocr_pool()
+_OCR_POOL = None
+_OCR_POOL_LOCK = threading.Lock()
+
+# Client-side rate limiting for Gemini: cap in-flight calls and back off on 429s
+_GEMINI_SEMAPHORE = threading.BoundedSemaphore(4)
+_GEMINI_MAX_ATTEMPTS = 3
+_GEMINI_BACKOFF_BASE = 1.0  # seconds
+_GEMINI_BACKOFF_JITTER = 0.25
+
+# Fallback parser patterns, compiled once at import
+# Keyword sets are matched with one case-insensitive alternation per line instead of a
+# lower() + substring scan per term
+_MERCHANT_SKIP_TERMS = ('receipt', 'customer', 'copy', 'thank', 'you', 'please', 'come', 'again')
+_MERCHANT_INDICATOR_TERMS = ('store', 'shop', 'market', 'restaurant', 'cafe')
+_ITEM_SKIP_TERMS = ('total', 'tax', 'receipt', 'thank you')  # 'total' also covers 'subtotal'
+
+_MERCHANT_SKIP_RE = re.compile('|'.join(map(re.escape, _MERCHANT_SKIP_TERMS)), re.IGNORECASE)
+_MERCHANT_INDICATOR_RE = re.compile('|'.join(map(re.escape, _MERCHANT_INDICATOR_TERMS)), re.IGNORECASE)
+_ITEM_SKIP_RE = re.compile('|'.join(map(re.escape, _ITEM_SKIP_TERMS)), re.IGNORECASE)
+_DIGIT_RE = re.compile(r'\d+')
+_DECIMAL_RE = re.compile(r'^\d+(?:\.\d+)?$')
+_WORD_RE = re.compile(r'[A-Za-z0-9]{2,}')
+# Share of whitespace-separated tokens that must look like words for a text layer to be trusted
+_TEXT_LAYER_MIN_WORD_RATIO = 0.5
+
+# Month names only, so words like "Qty" or "Items" next to numbers aren't read as a month
+_MONTH = (
+    r'(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?'
+    r'|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?'
+)
+# Each pattern needs a day, month and year on one line, so nothing is left for the parser to guess
+_DATE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'(?<!\d)(\d{1,2}[/-]\d{1,2}[/-](?:\d{4}|\d{2}))(?!\d)',              # MM/DD/YYYY or MM-DD-YYYY
+    r'(?<!\d)(\d{4}[/-]\d{1,2}[/-]\d{1,2})(?!\d)',                        # YYYY/MM/DD or YYYY-MM-DD
+    rf'(?<!\d)(\d{{1,2}}[ \t]+{_MONTH}[ \t]+(?:\d{{4}}|\d{{2}}))(?!\d)',  # DD Month YYYY
+    rf'\b({_MONTH}[ \t]+\d{{1,2}},?[ \t]+(?:\d{{4}}|\d{{2}}))(?!\d)',     # Month DD, YYYY
+)]
+
+_TIME_PATTERNS = [re.compile(p) for p in (
+    r'(\d{1,2}:\d{2}(?::\d{2})?\s*(?:AM|PM|am|pm)?)',  # HH:MM[:SS] [AM/PM]
+    r'(\d{1,2}:\d{2}(?::\d{2})?)',                     # HH:MM[:SS]
+)]
+
+# All amount labels in one alternation so the text is scanned once; the named
+# group that matched tells us which field the value belongs to
+_AMOUNTS_RE = re.compile(
+    r'sub\s*total[:\s]+\$?(?P<subtotal>\d+\.?\d*)'
+    r'|total(?:\s+due)?[:\s]+\$?(?P<total_amount>\d+\.?\d*)'
+    r'|(?:sales\s+)?tax[:\s]+\$?(?P<tax_amount>\d+\.?\d*)'
+    r'|(?:tip|gratuity)[:\s]+\$?(?P<tip_amount>\d+\.?\d*)'
+    r'|amount[:\s]+\$?(?P<amount>\d+\.?\d*)',
+    re.IGNORECASE
+)
+_AMOUNT_FIELDS = ('total_amount', 'subtotal', 'tax_amount', 'tip_amount')
+
+_PAYMENT_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'(credit|debit|cash|card|visa|mastercard|amex|american express)',
+    r'payment\s+method[:\s]+(\w+)',
+    r'paid\s+by[:\s]+(\w+)',
+)]
+
+_RECEIPT_NUMBER_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'receipt\s+#?[:\s]*(\w+)',
+    r'transaction\s+#?[:\s]*(\w+)',
+    r'ref\s+#?[:\s]*(\w+)',
+    r'#(\d+)',
+)]
+
+_CASHIER_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'cashier[:\s]+(\w+(?:\s+\w+)?)',
+    r'server[:\s]+(\w+(?:\s+\w+)?)',
+    r'served\s+by[:\s]+(\w+(?:\s+\w+)?)',
+)]
+
+# Item name followed by price
+_ITEM_PATTERN = re.compile(r'^(.+?)\s+\$?(\d+\.?\d*)$')
+
+
+class HashingReader:
+    """
+    File wrapper that feeds every byte read through SHA-256.
+    
+    Passed to default_storage.save() so an upload is hashed during the same
+    pass that writes it to storage instead of being read twice.
+    """
+    
+    def __init__(self, file):
+        self.file = file
+        self.name = file.name
+        self.size = file.size
+        self.hash = hashlib.sha256()
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self.file.read(size)
+        self.hash.update(data)
+        return data
+    
+    def seek(self, offset: int, whence: int = 0) -> int:
+        # Storage rewinds before copying; restart the digest with it
+        if offset == 0 and whence == 0:
+            self.hash = hashlib.sha256()
+        return self.file.seek(offset, whence)
+    
+    def tell(self) -> int:
+        return self.file.tell()
+    
+    def hexdigest(self) -> str:
+        return self.hash.hexdigest()
+
+
+def hash_file(file) -> str:
+    """
+    Return the SHA-256 hex digest of an uploaded file.
+    
+    Used for uploads spooled to a temp file, which storage moves into place
+    without reading, so they are hashed in a separate pass.
+    """
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _open_pdf(pdf_file: BinaryIO) -> fitz.Document:
+    """
+    Open a PDF from a file object.
+    
+    Files stored on the local filesystem (FileSystemStorage) are handed to MuPDF
+    by path so it reads them with its own buffered I/O, instead of first copying
+    the whole document into a Python bytes object. Other storage backends are
+    read into memory as before; their temp files may have a fileno, but their
+    name is the storage key rather than a local path.
+    """
+    name = getattr(pdf_file, 'name', None)
+    if isinstance(name, str) and os.path.isabs(name) and os.path.isfile(name):
+        return fitz.open(name, filetype="pdf")
+    return fitz.open(stream=pdf_file.read(), filetype="pdf")
+
+
+def validate_pdf(pdf_file: BinaryIO) -> Tuple[bool, Optional[str]]:
     """
     Validate if a file is a valid PDF.
     
     Args:
-        file_path: Path to the PDF file
+        pdf_file: Open binary file object for the PDF (e.g. from default_storage.open)
         
     Returns:
         Tuple of (is_valid, error_message)
     """
     try:
-        if not os.path.exists(file_path):
-            return False, "File does not exist"
-        
-        if not file_path.lower().endswith('.pdf'):
+        if not getattr(pdf_file, 'name', '').lower().endswith('.pdf'):
             return False, "File is not a PDF"
         
-        # Try to convert first page to check if it's a valid PDF
+        # Try to render the first page to check if it's a valid PDF
         try:
-            images = convert_from_path(file_path, first_page=1, last_page=1)
-            if not images:
-                return False, "PDF contains no readable pages"
-        except Exception as e:
+            with _open_pdf(pdf_file) as doc:
+                if doc.page_count == 0:
+                    return False, "PDF contains no readable pages"
+                doc.load_page(0).get_pixmap(dpi=72)
+        except fitz.FileDataError as e:
             return False, f"Invalid PDF format: {str(e)}"
+        except Exception as e:
+            return False, f"PDF page could not be rendered: {str(e)}"
         
         return True, None
     
@@ -49,38 +210,150 @@ def validate_pdf(file_path: str) -> Tuple[bool, Optional[str]]:
         return False, f"Validation error: {str(e)}"
 
 
-def extract_text_from_pdf(file_path: str) -> Optional[str]:
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    """
+    Return the process-wide OCR pool, creating it on first use.
+    
+    Receipts processed concurrently (threaded server or Celery thread pool) share
+    this pool, so their pages queue up together and keep every core busy instead of
+    each call spawning and tearing down its own workers. Workers are started by a
+    forkserver because the pool is created from multithreaded hosts, where a plain
+    fork can copy locks held by other threads and deadlock the children.
+    """
+    global _OCR_POOL
+    with _OCR_POOL_LOCK:
+        if _OCR_POOL is None:
+            _OCR_POOL = ProcessPoolExecutor(
+                max_workers=settings.OCR_MAX_WORKERS,
+                mp_context=multiprocessing.get_context('forkserver')
+            )
+        return _OCR_POOL
+
+
+def _discard_ocr_pool(executor: ProcessPoolExecutor) -> None:
+    """Drop a broken OCR pool so the next call starts a fresh one."""
+    global _OCR_POOL
+    with _OCR_POOL_LOCK:
+        if _OCR_POOL is executor:
+            _OCR_POOL = None
+    executor.shutdown(wait=False)
+
+
+def _single_page_pdf(doc: fitz.Document, page_number: int) -> bytes:
+    """Copy one page of an open document into a standalone PDF."""
+    with fitz.open() as page_doc:
+        page_doc.insert_pdf(doc, from_page=page_number, to_page=page_number)
+        return page_doc.tobytes()
+
+
+def _ocr_page(page_pdf: bytes) -> str:
+    """
+    Render a single-page PDF and run OCR on it.
+    
+    Module-level so it can be pickled for worker processes; fitz objects can't
+    cross processes, so each worker gets only its own page as PDF bytes rather
+    than the whole document or a rendered bitmap.
+    """
+    # Render straight to grayscale; Tesseract binarizes anyway, so RGB only triples the pixel data
+    with fitz.open(stream=page_pdf, filetype="pdf") as doc:
+        pix = doc.load_page(0).get_pixmap(dpi=settings.OCR_DPI, colorspace=fitz.csGRAY)
+    image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    # Drop the pixmap before OCR so only one copy of the page is held while Tesseract runs
+    del pix
+    try:
+        return pytesseract.image_to_string(image, lang=settings.OCR_LANG, config=_TESSERACT_CONFIG)
+    except Exception as e:
+        # Some pytesseract exceptions can't be unpickled, which would break the whole pool
+        raise RuntimeError(f"{type(e).__name__}: {str(e)}") from None
+
+
+def _has_usable_text_layer(text: str) -> bool:
+    """
+    Decide whether an embedded text layer is real text rather than glyph noise.
+    
+    Some scanners embed an invisible layer of stray symbols; requiring enough
+    word-like tokens keeps those documents on the OCR path.
+    """
+    if len(text.strip()) <= settings.OCR_TEXT_LAYER_MIN_CHARS:
+        return False
+    
+    tokens = text.split()
+    words = sum(1 for token in tokens if _WORD_RE.search(token))
+    return words >= len(tokens) * _TEXT_LAYER_MIN_WORD_RATIO
+
+
+def extract_text_from_pdf(pdf_file: BinaryIO) -> Optional[str]:
     """
-    Extract text from a PDF file using OCR.
+    Extract text from a PDF file.
+    
+    Born-digital PDFs (e-receipts) are read from their embedded text layer;
+    scanned PDFs fall back to OCR.
     
     Args:
-        file_path: Path to the PDF file
+        pdf_file: Open binary file object for the PDF (e.g. from default_storage.open)
         
     Returns:
         Extracted text or None if extraction fails
+        
+    Raises:
+        BrokenProcessPool: If an OCR worker died; the pool is discarded first
     """
     try:
-        # Convert PDF to images
-        images = convert_from_path(file_path, dpi=300)
+        with _open_pdf(pdf_file) as doc:
+            digital_text = '\n'.join(page.get_text("text") for page in doc)
+            
+            if _has_usable_text_layer(digital_text):
+                logger.info("Using embedded PDF text layer, skipping OCR")
+                return digital_text
+            
+            # Pages are rasterized and OCR'd inside the pool workers, so rendering
+            # already runs in parallel across processes without holding the GIL here
+            executor = _get_ocr_pool()
+            futures = [executor.submit(_ocr_page, _single_page_pdf(doc, i)) for i in range(doc.page_count)]
         
         all_text = []
-        for i, image in enumerate(images):
+        for i, future in enumerate(futures):
             try:
-                # Use OCR to extract text from image
-                text = pytesseract.image_to_string(image, config='--psm 6')
-                all_text.append(text)
+                all_text.append(future.result())
                 logger.info(f"Extracted text from page {i+1}")
+            except BrokenProcessPool:
+                raise
             except Exception as e:
                 logger.error(f"Error extracting text from page {i+1}: {str(e)}")
                 continue
         
         return '\n'.join(all_text) if all_text else None
     
+    except BrokenProcessPool:
+        # A crashed worker breaks the whole pool; drop it and let the caller retry on a fresh one
+        _discard_ocr_pool(executor)
+        raise
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {str(e)}")
         return None
 
 
+def _generate_with_backoff(model, prompt: str):
+    """
+    Call Gemini with bounded concurrency, retrying rate-limit errors with jittered exponential backoff.
+    
+    Returns:
+        The Gemini response, or None if the rate limit was still hit after all retries
+    """
+    for attempt in range(_GEMINI_MAX_ATTEMPTS):
+        try:
+            with _GEMINI_SEMAPHORE:
+                return model.generate_content(prompt)
+        except google_exceptions.ResourceExhausted as e:
+            logger.warning(f"Gemini rate limit hit (attempt {attempt+1}/{_GEMINI_MAX_ATTEMPTS}): {str(e)}")
+            if attempt + 1 < _GEMINI_MAX_ATTEMPTS:
+                jitter = random.uniform(1 - _GEMINI_BACKOFF_JITTER, 1 + _GEMINI_BACKOFF_JITTER)
+                time.sleep(_GEMINI_BACKOFF_BASE * (2 ** attempt) * jitter)
+    
+    logger.error("Gemini rate limit retries exhausted")
+    return None
+
+
 def parse_receipt_with_gemini(raw_text: str) -> Dict:
     """
     Parse receipt text using Gemini AI to extract structured information.
@@ -92,8 +365,17 @@ def parse_receipt_with_gemini(raw_text: str) -> Dict:
         Dictionary containing parsed receipt data
     """
     try:
-        # Initialize Gemini model
-        model = genai.GenerativeModel('gemini-pro')
+        model = _GEMINI_MODEL
+        if model is None:
+            logger.warning("Gemini model not initialized, using fallback parsing")
+            return get_fallback_parsing(raw_text)
+        
+        # Identical OCR text always yields the same structured data, so skip the API call
+        cache_key = f"gemini:{hashlib.sha256(raw_text.encode('utf-8')).hexdigest()}"
+        cached_data = cache.get(cache_key)
+        if cached_data is not None:
+            logger.info("Using cached Gemini parse result")
+            return cached_data
         
         # Create a detailed prompt for receipt parsing
         prompt = f"""
@@ -134,34 +416,35 @@ def parse_receipt_with_gemini(raw_text: str) -> Dict:
         """
         
         # Generate response from Gemini
-        response = model.generate_content(prompt)
+        response = _generate_with_backoff(model, prompt)
+        if response is None:
+            return get_fallback_parsing(raw_text)
         
         if not response.text:
             logger.error("Empty response from Gemini API")
             return get_fallback_parsing(raw_text)
         
-        # Clean the response text
-        response_text = response.text.strip()
-        
-        # Remove any markdown formatting if present
-        if response_text.startswith('```json'):
-            response_text = response_text[7:]
-        if response_text.endswith('```'):
-            response_text = response_text[:-3]
-        
-        response_text = response_text.strip()
+        # Clean the response text, removing any markdown code fence
+        response_text = (
+            response.text.strip()
+            .removeprefix('```json')
+            .removeprefix('```')
+            .removesuffix('```')
+            .strip()
+        )
         
         # Parse JSON response
         try:
-            parsed_data = json.loads(response_text)
+            parsed_data = orjson.loads(response_text)
             
             # Validate and clean the parsed data
             cleaned_data = validate_and_clean_gemini_response(parsed_data)
+            cache.set(cache_key, cleaned_data, timeout=settings.GEMINI_CACHE_TIMEOUT)
             
             logger.info("Successfully parsed receipt with Gemini AI")
             return cleaned_data
             
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse Gemini JSON response: {str(e)}")
             logger.error(f"Response text: {response_text}")
             return get_fallback_parsing(raw_text)
@@ -171,6 +454,20 @@ def parse_receipt_with_gemini(raw_text: str) -> Dict:
         return get_fallback_parsing(raw_text)
 
 
+def _to_decimal(value) -> Optional[Decimal]:
+    """
+    Convert a number from the AI response to a non-negative Decimal.
+    
+    Values are checked against a precompiled pattern before conversion, so
+    malformed input is rejected without raising and catching InvalidOperation.
+    
+    Returns:
+        The Decimal value, or None if the value isn't a plain non-negative number
+    """
+    text = str(value).strip()
+    return Decimal(text) if _DECIMAL_RE.match(text) else None
+
+
 def validate_and_clean_gemini_response(data: Dict) -> Dict:
     """
     Validate and clean the Gemini API response data.
@@ -223,11 +520,10 @@ def validate_and_clean_gemini_response(data: Dict) -> Dict:
     amount_fields = ['total_amount', 'subtotal', 'tax_amount', 'tip_amount']
     for field in amount_fields:
         if data.get(field) is not None:
-            try:
-                amount = float(data[field])
-                if amount >= 0:  # Ensure non-negative amounts
-                    cleaned_data[field] = Decimal(str(amount))
-            except (ValueError, TypeError, InvalidOperation):
+            amount = _to_decimal(data[field])
+            if amount is not None:
+                cleaned_data[field] = amount
+            else:
                 logger.warning(f"Invalid amount for {field}: {data.get(field)}")
     
     # Clean items
@@ -243,22 +539,16 @@ def validate_and_clean_gemini_response(data: Dict) -> Dict:
                 
                 # Clean quantity
                 if item.get('quantity') is not None:
-                    try:
-                        qty = float(item['quantity'])
-                        if qty > 0:
-                            cleaned_item['quantity'] = Decimal(str(qty))
-                    except (ValueError, TypeError, InvalidOperation):
-                        pass
+                    qty = _to_decimal(item['quantity'])
+                    if qty:
+                        cleaned_item['quantity'] = qty
                 
                 # Clean prices
                 for price_field in ['unit_price', 'total_price']:
                     if item.get(price_field) is not None:
-                        try:
-                            price = float(item[price_field])
-                            if price >= 0:
-                                cleaned_item[price_field] = Decimal(str(price))
-                        except (ValueError, TypeError, InvalidOperation):
-                            pass
+                        price = _to_decimal(item[price_field])
+                        if price is not None:
+                            cleaned_item[price_field] = price
                 
                 cleaned_data['items'].append(cleaned_item)
     
@@ -344,7 +634,7 @@ def parse_receipt_text(text: str) -> Dict:
         Dictionary containing parsed receipt data
     """
     # First try Gemini AI parsing
-    if settings.GEMINI_API_KEY and settings.GEMINI_API_KEY != 'your-gemini-api-key-here':
+    if _GEMINI_MODEL is not None:
         return parse_receipt_with_gemini(text)
     else:
         logger.warning("Gemini API key not configured, using fallback parsing")
@@ -354,15 +644,13 @@ def parse_receipt_text(text: str) -> Dict:
 def extract_merchant_name(lines: List[str]) -> Optional[str]:
     """Extract merchant name from receipt lines."""
     # Skip very short lines and common receipt terms
-    skip_terms = {'receipt', 'customer', 'copy', 'thank', 'you', 'please', 'come', 'again'}
-    
     for line in lines[:5]:  # Check first 5 lines
-        if len(line) > 3 and not any(term in line.lower() for term in skip_terms):
+        if len(line) > 3 and not _MERCHANT_SKIP_RE.search(line):
             # Check if line contains business indicators
-            if any(indicator in line.lower() for indicator in ['store', 'shop', 'market', 'restaurant', 'cafe']):
+            if _MERCHANT_INDICATOR_RE.search(line):
                 return line
             # If it's a substantial line without numbers, it's likely the merchant name
-            if not re.search(r'\d+', line) and len(line) > 5:
+            if not _DIGIT_RE.search(line) and len(line) > 5:
                 return line
     
     # Fallback to first substantial line
@@ -375,64 +663,31 @@ def extract_merchant_name(lines: List[str]) -> Optional[str]:
 
 def extract_date_time(text: str) -> Optional[datetime]:
     """Extract date and time from receipt text."""
-    # Common date patterns
-    date_patterns = [
-        r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',  # MM/DD/YYYY or MM-DD-YYYY
-        r'(\d{2,4}[/-]\d{1,2}[/-]\d{1,2})',  # YYYY/MM/DD or YYYY-MM-DD
-        r'(\d{1,2}\s+\w+\s+\d{2,4})',        # DD Month YYYY
-        r'(\w+\s+\d{1,2},?\s+\d{2,4})',      # Month DD, YYYY
-    ]
-    
-    time_patterns = [
-        r'(\d{1,2}:\d{2}(?::\d{2})?\s*(?:AM|PM|am|pm)?)',  # HH:MM[:SS] [AM/PM]
-        r'(\d{1,2}:\d{2}(?::\d{2})?)',                     # HH:MM[:SS]
-    ]
-    
     found_date = None
     found_time = None
     
     # Extract date
-    for pattern in date_patterns:
-        match = re.search(pattern, text)
+    for pattern in _DATE_PATTERNS:
+        match = pattern.search(text)
         if match:
             found_date = match.group(1)
             break
     
     # Extract time
-    for pattern in time_patterns:
-        match = re.search(pattern, text)
+    for pattern in _TIME_PATTERNS:
+        match = pattern.search(text)
         if match:
             found_time = match.group(1)
             break
     
-    # Try to parse the date and time
+    # Parse date and time together in one pass; retry with the date alone if the time is garbled
     if found_date:
-        try:
-            # Try different date formats
-            for fmt in ['%m/%d/%Y', '%m-%d-%Y', '%Y/%m/%d', '%Y-%m-%d', '%d %B %Y', '%B %d, %Y']:
-                try:
-                    parsed_date = datetime.strptime(found_date, fmt)
-                    if found_time:
-                        # Try to parse time
-                        try:
-                            time_part = datetime.strptime(found_time, '%H:%M:%S').time()
-                        except ValueError:
-                            try:
-                                time_part = datetime.strptime(found_time, '%H:%M').time()
-                            except ValueError:
-                                try:
-                                    time_part = datetime.strptime(found_time, '%I:%M %p').time()
-                                except ValueError:
-                                    time_part = None
-                        
-                        if time_part:
-                            return datetime.combine(parsed_date.date(), time_part)
-                    
-                    return parsed_date
-                except ValueError:
-                    continue
-        except Exception as e:
-            logger.error(f"Error parsing date: {str(e)}")
+        candidates = [f"{found_date} {found_time.strip()}", found_date] if found_time else [found_date]
+        for candidate in candidates:
+            try:
+                return dateparser.parse(candidate)
+            except (ValueError, OverflowError) as e:
+                logger.warning(f"Could not parse date '{candidate}': {str(e)}")
     
     return None
 
@@ -440,52 +695,35 @@ def extract_date_time(text: str) -> Optional[datetime]:
 def extract_amounts(text: str) -> Dict:
     """Extract various amounts from receipt text."""
     amounts = {}
+    generic_amount = None
     
-    # Patterns for different amounts
-    patterns = {
-        'total_amount': [
-            r'total[:\s]+\$?(\d+\.?\d*)',
-            r'amount[:\s]+\$?(\d+\.?\d*)',
-            r'total\s+due[:\s]+\$?(\d+\.?\d*)',
-        ],
-        'subtotal': [
-            r'subtotal[:\s]+\$?(\d+\.?\d*)',
-            r'sub\s+total[:\s]+\$?(\d+\.?\d*)',
-        ],
-        'tax_amount': [
-            r'tax[:\s]+\$?(\d+\.?\d*)',
-            r'sales\s+tax[:\s]+\$?(\d+\.?\d*)',
-        ],
-        'tip_amount': [
-            r'tip[:\s]+\$?(\d+\.?\d*)',
-            r'gratuity[:\s]+\$?(\d+\.?\d*)',
-        ]
-    }
+    for match in _AMOUNTS_RE.finditer(text):
+        field = match.lastgroup
+        if field in amounts or (field == 'amount' and generic_amount is not None):
+            continue
+        try:
+            amount_value = Decimal(match.group(field))
+        except (ValueError, InvalidOperation):
+            continue
+        
+        if field == 'amount':
+            generic_amount = amount_value
+        else:
+            amounts[field] = amount_value
+            if len(amounts) == len(_AMOUNT_FIELDS):
+                break
     
-    for amount_type, pattern_list in patterns.items():
-        for pattern in pattern_list:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    amount_value = Decimal(match.group(1))
-                    amounts[amount_type] = amount_value
-                    break
-                except (ValueError, InvalidOperation):
-                    continue
+    # A bare "Amount:" line only counts as the total when no explicit total was found
+    if 'total_amount' not in amounts and generic_amount is not None:
+        amounts['total_amount'] = generic_amount
     
     return amounts
 
 
 def extract_payment_method(text: str) -> Optional[str]:
     """Extract payment method from receipt text."""
-    payment_patterns = [
-        r'(credit|debit|cash|card|visa|mastercard|amex|american express)',
-        r'payment\s+method[:\s]+(\w+)',
-        r'paid\s+by[:\s]+(\w+)',
-    ]
-    
-    for pattern in payment_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _PAYMENT_PATTERNS:
+        match = pattern.search(text)
         if match:
             return match.group(1).upper()
     
@@ -494,15 +732,8 @@ def extract_payment_method(text: str) -> Optional[str]:
 
 def extract_receipt_number(text: str) -> Optional[str]:
     """Extract receipt number from text."""
-    receipt_patterns = [
-        r'receipt\s+#?[:\s]*(\w+)',
-        r'transaction\s+#?[:\s]*(\w+)',
-        r'ref\s+#?[:\s]*(\w+)',
-        r'#(\d+)',
-    ]
-    
-    for pattern in receipt_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _RECEIPT_NUMBER_PATTERNS:
+        match = pattern.search(text)
         if match:
             return match.group(1)
     
@@ -511,14 +742,8 @@ def extract_receipt_number(text: str) -> Optional[str]:
 
 def extract_cashier(text: str) -> Optional[str]:
     """Extract cashier name from text."""
-    cashier_patterns = [
-        r'cashier[:\s]+(\w+(?:\s+\w+)?)',
-        r'server[:\s]+(\w+(?:\s+\w+)?)',
-        r'served\s+by[:\s]+(\w+(?:\s+\w+)?)',
-    ]
-    
-    for pattern in cashier_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern in _CASHIER_PATTERNS:
+        match = pattern.search(text)
         if match:
             return match.group(1)
     
@@ -529,15 +754,12 @@ def extract_items(lines: List[str]) -> List[Dict]:
     """Extract individual items from receipt lines."""
     items = []
     
-    # Pattern to match item lines (item name followed by price)
-    item_pattern = r'^(.+?)\s+\$?(\d+\.?\d*)$'
-    
     for line in lines:
         # Skip lines that look like headers or totals
-        if any(keyword in line.lower() for keyword in ['total', 'subtotal', 'tax', 'receipt', 'thank you']):
+        if _ITEM_SKIP_RE.search(line):
             continue
         
-        match = re.match(item_pattern, line.strip())
+        match = _ITEM_PATTERN.match(line.strip())
         if match:
             item_name = match.group(1).strip()
             try:
@@ -1,240 +1,257 @@
-import os
+import time
+import uuid
 import logging
-from decimal import Decimal, InvalidOperation
+from functools import lru_cache
 from datetime import datetime
-from django.conf import settings
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-from django.http import Http404
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
+from celery.result import AsyncResult
 from rest_framework import status
 from rest_framework.decorators import api_view, parser_classes
+from rest_framework.exceptions import ParseError
+from rest_framework.generics import get_object_or_404
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
-from .models import ReceiptFile, Receipt, ReceiptItem
-from .serializers import ReceiptFileSerializer, ReceiptSerializer, FileUploadSerializer
-from .utils import validate_pdf, extract_text_from_pdf, parse_receipt_text
+from .models import ReceiptFile, Receipt
+from .serializers import ReceiptFileSerializer, ReceiptSerializer, ReceiptListSerializer, FileUploadSerializer
+from .utils import HashingReader, hash_file, validate_pdf
+from .tasks import process_receipt_file
+from .pagination import ReceiptPagination
+from .renderers import ORJSONRenderer
 
 logger = logging.getLogger(__name__)
 
+# Columns read by ReceiptListSerializer; raw_text is only loaded when asked for
+RECEIPT_DETAIL_COLUMNS = (
+    'id', 'purchased_at', 'merchant_name', 'total_amount',
+    'subtotal', 'tax_amount', 'tip_amount', 'payment_method',
+    'receipt_number', 'cashier', 'file_path',
+    'created_at', 'updated_at'
+)
+
+
+def paginated_response(request, queryset, serializer_class, key):
+    """Serialize a single page of the queryset under the given response key."""
+    paginator = ReceiptPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = serializer_class(page, many=True)
+    return Response({
+        key: serializer.data,
+        'next': paginator.get_next_link(),
+        'previous': paginator.get_previous_link()
+    }, status=status.HTTP_200_OK)
+
+
+def save_uploaded_receipt(request):
+    """Check the uploaded PDF, stream it to storage and record it as a ReceiptFile."""
+    serializer = FileUploadSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    uploaded_file = serializer.validated_data['file']
+    
+    # Random prefix keeps names unique without storage probing for a free name
+    filename = f"{uuid.uuid4().hex}_{uploaded_file.name}"
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        # Spooled to disk: hash it, then let storage move the temp file into place
+        # (a rename on FileSystemStorage) instead of copying it through a wrapper
+        content_hash = hash_file(uploaded_file)
+        file_path = default_storage.save(f'receipts/{filename}', uploaded_file)
+    else:
+        # Held in memory: hash it on the way to storage so it is only read once
+        reader = HashingReader(uploaded_file)
+        file_path = default_storage.save(f'receipts/{filename}', reader)
+        content_hash = reader.hexdigest()
+    
+    # Create receipt file record; the serializer already checked the %PDF- header,
+    # so the file is ready to process without a separate validate call
+    receipt_file = ReceiptFile.objects.create(
+        file_name=uploaded_file.name,
+        file_path=file_path,
+        content_hash=content_hash,
+        is_valid=True,
+        is_processed=False
+    )
+    
+    return receipt_file
+
 
 @api_view(['POST'])
 @parser_classes([MultiPartParser, FormParser])
 def upload_receipt(request):
     """Upload a receipt file (PDF format only)."""
-    try:
-        serializer = FileUploadSerializer(data=request.data)
-        if serializer.is_valid():
-            uploaded_file = serializer.validated_data['file']
-            
-            # Create unique filename to avoid conflicts
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f"{timestamp}_{uploaded_file.name}"
-            file_path = default_storage.save(f'receipts/{filename}', ContentFile(uploaded_file.read()))
-            
-            # Create receipt file record
-            receipt_file = ReceiptFile.objects.create(
-                file_name=uploaded_file.name,
-                file_path=file_path,
-                is_valid=False,
-                is_processed=False
-            )
-            
-            return Response({
-                'message': 'File uploaded successfully',
-                'file_id': receipt_file.id,
-                'file_name': receipt_file.file_name
-            }, status=status.HTTP_201_CREATED)
-        
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
-    except Exception as e:
-        logger.error(f"Error uploading file: {str(e)}")
-        return Response({
-            'error': 'Failed to upload file',
-            'details': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    receipt_file = save_uploaded_receipt(request)
+    
+    return Response({
+        'message': 'File uploaded successfully',
+        'file_id': receipt_file.id,
+        'file_name': receipt_file.file_name,
+        'is_valid': receipt_file.is_valid
+    }, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@parser_classes([MultiPartParser, FormParser])
+def upload_and_process_receipt(request):
+    """Upload a receipt file and queue it for OCR/AI extraction in a single request."""
+    receipt_file = save_uploaded_receipt(request)
+    task = process_receipt_file.delay(receipt_file.id)
+    
+    return Response({
+        'message': 'Receipt uploaded and queued for processing',
+        'status': 'queued',
+        'task_id': task.id,
+        'file_id': receipt_file.id,
+        'file_name': receipt_file.file_name
+    }, status=status.HTTP_202_ACCEPTED)
 
 
 @api_view(['POST'])
 def validate_receipt(request):
-    """Validate whether the uploaded file is a valid PDF."""
-    try:
-        file_id = request.data.get('file_id')
-        if not file_id:
-            return Response({
-                'error': 'file_id is required'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        try:
-            receipt_file = ReceiptFile.objects.get(id=file_id)
-        except ReceiptFile.DoesNotExist:
-            return Response({
-                'error': 'Receipt file not found'
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        # Validate PDF
-        full_path = os.path.join(settings.MEDIA_ROOT, receipt_file.file_path)
-        is_valid, error_message = validate_pdf(full_path)
-        
-        # Update receipt file record
-        receipt_file.is_valid = is_valid
-        receipt_file.invalid_reason = error_message if not is_valid else None
-        receipt_file.save()
-        
+    """Validate whether the uploaded file is a valid PDF (a no-op for files already validated at upload)."""
+    file_id = request.data.get('file_id')
+    if not file_id:
+        raise ParseError('file_id is required')
+    
+    receipt_file = get_object_or_404(
+        ReceiptFile.objects.only('id', 'file_path', 'is_valid', 'invalid_reason'), id=file_id
+    )
+    
+    if receipt_file.is_valid:
         return Response({
             'file_id': receipt_file.id,
-            'is_valid': is_valid,
-            'message': 'PDF is valid' if is_valid else f'PDF is invalid: {error_message}'
+            'is_valid': True,
+            'message': 'PDF is valid'
         }, status=status.HTTP_200_OK)
     
-    except Exception as e:
-        logger.error(f"Error validating file: {str(e)}")
-        return Response({
-            'error': 'Failed to validate file',
-            'details': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    # Validate PDF
+    try:
+        with default_storage.open(receipt_file.file_path, 'rb') as pdf_file:
+            is_valid, error_message = validate_pdf(pdf_file)
+    except FileNotFoundError:
+        is_valid, error_message = False, "File does not exist"
+    
+    # Update receipt file record
+    receipt_file.is_valid = is_valid
+    receipt_file.invalid_reason = error_message if not is_valid else None
+    receipt_file.save(update_fields=['is_valid', 'invalid_reason', 'updated_at'])
+    
+    return Response({
+        'file_id': receipt_file.id,
+        'is_valid': is_valid,
+        'message': 'PDF is valid' if is_valid else f'PDF is invalid: {error_message}'
+    }, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 def process_receipt(request):
-    """Extract receipt details using OCR/AI."""
-    try:
-        file_id = request.data.get('file_id')
-        if not file_id:
-            return Response({
-                'error': 'file_id is required'
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        try:
-            receipt_file = ReceiptFile.objects.get(id=file_id)
-        except ReceiptFile.DoesNotExist:
-            return Response({
-                'error': 'Receipt file not found'
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        if not receipt_file.is_valid:
-            return Response({
-                'error': 'File is not valid for processing',
-                'reason': receipt_file.invalid_reason
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Extract text from PDF
-        full_path = os.path.join(settings.MEDIA_ROOT, receipt_file.file_path)
-        extracted_text = extract_text_from_pdf(full_path)
-        
-        if not extracted_text:
-            return Response({
-                'error': 'Failed to extract text from PDF'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
-        # Parse receipt information
-        receipt_data = parse_receipt_text(extracted_text)
-        
-        # Create receipt record
-        receipt = Receipt.objects.create(
-            purchased_at=receipt_data.get('purchased_at'),
-            merchant_name=receipt_data.get('merchant_name', ''),
-            total_amount=receipt_data.get('total_amount'),
-            subtotal=receipt_data.get('subtotal'),
-            tax_amount=receipt_data.get('tax_amount'),
-            tip_amount=receipt_data.get('tip_amount'),
-            payment_method=receipt_data.get('payment_method', ''),
-            receipt_number=receipt_data.get('receipt_number', ''),
-            cashier=receipt_data.get('cashier', ''),
-            raw_text=extracted_text,
-            file_path=receipt_file.file_path,
-            receipt_file=receipt_file
-        )
-        
-        # Create receipt items
-        for item_data in receipt_data.get('items', []):
-            ReceiptItem.objects.create(
-                receipt=receipt,
-                item_name=item_data.get('name', ''),
-                quantity=item_data.get('quantity', 1),
-                unit_price=item_data.get('unit_price'),
-                total_price=item_data.get('total_price')
-            )
-        
-        # Mark as processed
-        receipt_file.is_processed = True
-        receipt_file.save()
-        
-        # Serialize and return the receipt
-        serializer = ReceiptSerializer(receipt)
-        return Response({
-            'message': 'Receipt processed successfully',
-            'receipt': serializer.data
-        }, status=status.HTTP_200_OK)
+    """Queue a receipt file for OCR/AI extraction."""
+    file_id = request.data.get('file_id')
+    if not file_id:
+        raise ParseError('file_id is required')
     
-    except Exception as e:
-        logger.error(f"Error processing receipt: {str(e)}")
+    receipt_file = get_object_or_404(ReceiptFile.objects.only('id', 'is_valid', 'invalid_reason'), id=file_id)
+    
+    if not receipt_file.is_valid:
         return Response({
-            'error': 'Failed to process receipt',
-            'details': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            'error': 'File is not valid for processing',
+            'reason': receipt_file.invalid_reason
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    # OCR + parsing run on a Celery worker; poll receipts/status/<task_id>/ for the outcome
+    task = process_receipt_file.delay(receipt_file.id)
+    
+    return Response({
+        'message': 'Receipt queued for processing',
+        'status': 'queued',
+        'task_id': task.id,
+        'file_id': receipt_file.id
+    }, status=status.HTTP_202_ACCEPTED)
 
 
 @api_view(['GET'])
 def list_receipts(request):
-    """List all receipts stored in the database."""
-    try:
-        receipts = Receipt.objects.all()
-        serializer = ReceiptSerializer(receipts, many=True)
-        return Response({
-            'receipts': serializer.data,
-            'count': len(serializer.data)
-        }, status=status.HTTP_200_OK)
-    
-    except Exception as e:
-        logger.error(f"Error listing receipts: {str(e)}")
-        return Response({
-            'error': 'Failed to list receipts',
-            'details': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    """List receipts stored in the database, one page at a time."""
+    receipts = Receipt.objects.defer('raw_text').prefetch_related('items')
+    return paginated_response(request, receipts, ReceiptListSerializer, 'receipts')
+
+
+@api_view(['GET'])
+def export_receipts(request):
+    """Stream every receipt as JSON lines without loading the whole table into memory."""
+    receipts = Receipt.objects.only(*RECEIPT_DETAIL_COLUMNS).prefetch_related('items').iterator(chunk_size=1000)
+    serializer = ReceiptListSerializer()
+    renderer = ORJSONRenderer()
+    rows = (renderer.render(serializer.to_representation(receipt)) + b'\n' for receipt in receipts)
+    return StreamingHttpResponse(rows, content_type='application/x-ndjson')
 
 
 @api_view(['GET'])
 def get_receipt(request, receipt_id):
-    """Retrieve details of a specific receipt by its ID."""
-    try:
-        try:
-            receipt = Receipt.objects.get(id=receipt_id)
-        except Receipt.DoesNotExist:
-            return Response({
-                'error': 'Receipt not found'
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        serializer = ReceiptSerializer(receipt)
-        return Response({
-            'receipt': serializer.data
-        }, status=status.HTTP_200_OK)
+    """Retrieve details of a specific receipt by its ID; pass ?include=raw_text for the OCR text."""
+    columns = RECEIPT_DETAIL_COLUMNS
+    serializer_class = ReceiptListSerializer
+    if 'raw_text' in request.query_params.getlist('include'):
+        columns += ('raw_text',)
+        serializer_class = ReceiptSerializer
     
-    except Exception as e:
-        logger.error(f"Error retrieving receipt: {str(e)}")
-        return Response({
-            'error': 'Failed to retrieve receipt',
-            'details': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    receipt = get_object_or_404(
+        Receipt.objects.only(*columns).prefetch_related('items'), id=receipt_id
+    )
+    
+    serializer = serializer_class(receipt)
+    return Response({
+        'receipt': serializer.data
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def get_processing_status(request, task_id):
+    """Report the state of a background receipt processing task."""
+    result = AsyncResult(task_id)
+    response_data = {
+        'task_id': task_id,
+        'status': result.status
+    }
+    
+    if result.successful():
+        response_data['result'] = result.result
+    elif result.failed():
+        # Keep the exception details in the logs rather than sending them to clients
+        logger.error(f"Processing task {task_id} failed: {str(result.result)}")
+        response_data['error'] = 'Receipt processing failed'
+    
+    return Response(response_data, status=status.HTTP_200_OK)
 
 
 @api_view(['GET'])
 def list_receipt_files(request):
-    """List all receipt files."""
-    try:
-        receipt_files = ReceiptFile.objects.all()
-        serializer = ReceiptFileSerializer(receipt_files, many=True)
-        return Response({
-            'receipt_files': serializer.data,
-            'count': len(serializer.data)
-        }, status=status.HTTP_200_OK)
+    """List receipt files, one page at a time."""
+    receipt_files = ReceiptFile.objects.prefetch_related(
+        Prefetch('receipts', queryset=Receipt.objects.defer('raw_text').prefetch_related('items'))
+    )
+    return paginated_response(request, receipt_files, ReceiptFileSerializer, 'receipt_files')
+
+
+@api_view(['GET'])
+def get_receipt_file(request, file_id):
+    """Retrieve a receipt file and its processing status by its ID."""
+    receipt_file = get_object_or_404(
+        ReceiptFile.objects.prefetch_related(
+            Prefetch('receipts', queryset=Receipt.objects.defer('raw_text').prefetch_related('items'))
+        ),
+        id=file_id
+    )
     
-    except Exception as e:
-        logger.error(f"Error listing receipt files: {str(e)}")
-        return Response({
-            'error': 'Failed to list receipt files',
-            'details': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    serializer = ReceiptFileSerializer(receipt_file)
+    return Response({
+        'receipt_file': serializer.data
+    }, status=status.HTTP_200_OK)
+
+
+@lru_cache(maxsize=1)
+def _health_timestamp(second):
+    """Format a Unix second once; health probes within the same second reuse it."""
+    return datetime.fromtimestamp(second).isoformat()
 
 
 @api_view(['GET'])
@@ -242,5 +259,5 @@ def health_check(request):
     """Health check endpoint."""
     return Response({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': _health_timestamp(int(time.time()))
     }, status=status.HTTP_200_OK)
\ No newline at end of file
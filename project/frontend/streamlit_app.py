@@ -1,13 +1,59 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from urllib3.util.retry import Retry
 import json
+import os
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from urllib.parse import urlparse
+import numpy as np
 import pandas as pd
 from io import BytesIO
 import base64
 
+try:
+    # orjson decodes large list responses several times faster; both parsers accept raw bytes
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
 # Configuration
 API_BASE_URL = "http://localhost:8000/api"
+CSS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "style.css")
+PROCESS_POLL_INTERVAL = 2  # seconds between status checks for queued receipts
+PROCESS_POLL_ATTEMPTS = 60
+LIST_PAGE_LIMIT = 500  # rows requested per page from the paginated list endpoints
+REQUEST_TIMEOUT = (3.05, 15)  # (connect, read) seconds, so a hung backend can't stall the page
+# Processing requests may run OCR + Gemini inline when the backend runs tasks eagerly
+PROCESS_REQUEST_TIMEOUT = (3.05, 300)
+
+@st.cache_resource(show_spinner=False)
+def get_session():
+    """
+    Shared HTTP session so repeated API calls reuse pooled keep-alive connections.
+    
+    Cached as a resource because Streamlit re-executes the script on every
+    interaction; a module-level session would be rebuilt, with an empty pool, each time.
+    """
+    session = requests.Session()
+    session.headers.update({'Accept': 'application/json'})
+    # Retry connection failures and gateway errors with backoff; POSTs are left out so uploads
+    # and processing requests are never sent twice
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+SESSION = get_session()
 
 # Page configuration
 st.set_page_config(
@@ -18,77 +64,14 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling
-st.markdown("""
-<style>
-    .main-header {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        padding: 2rem 0;
-        margin: -1rem -1rem 2rem -1rem;
-        text-align: center;
-        color: white;
-        border-radius: 0 0 10px 10px;
-    }
-    
-    .stat-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        border-left: 4px solid #667eea;
-        margin: 1rem 0;
-    }
-    
-    .success-message {
-        background: linear-gradient(90deg, #56ab2f 0%, #a8e6cf 100%);
-        color: white;
-        padding: 1rem;
-        border-radius: 5px;
-        margin: 1rem 0;
-    }
-    
-    .error-message {
-        background: linear-gradient(90deg, #ff416c 0%, #ff4b2b 100%);
-        color: white;
-        padding: 1rem;
-        border-radius: 5px;
-        margin: 1rem 0;
-    }
-    
-    .warning-message {
-        background: linear-gradient(90deg, #f7971e 0%, #ffd200 100%);
-        color: #333;
-        padding: 1rem;
-        border-radius: 5px;
-        margin: 1rem 0;
-    }
-    
-    .receipt-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 10px;
-        box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        margin: 1rem 0;
-        border: 1px solid #e0e0e0;
-    }
-    
-    .upload-section {
-        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-        padding: 2rem;
-        border-radius: 10px;
-        margin: 1rem 0;
-    }
-    
-    .gemini-badge {
-        background: linear-gradient(90deg, #4285f4 0%, #34a853 100%);
-        color: white;
-        padding: 0.5rem 1rem;
-        border-radius: 20px;
-        font-size: 0.8rem;
-        display: inline-block;
-        margin: 0.5rem 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def load_css():
+    """Read style.css once per server process, with whitespace collapsed to shrink the per-rerun payload."""
+    with open(CSS_PATH, encoding='utf-8') as css_file:
+        return re.sub(r'\s+', ' ', css_file.read()).strip()
+
+# Streamlit drops elements a rerun doesn't emit, so the (cached) stylesheet is still sent every run
+st.markdown(f"<style>{load_css()}</style>", unsafe_allow_html=True)
 
 # Header
 st.markdown("""
@@ -109,41 +92,208 @@ page = st.sidebar.selectbox("Choose a page", [
     "⚙️ API Configuration"
 ])
 
-def make_request(endpoint, method="GET", data=None, files=None):
+def make_request(endpoint, method="GET", data=None, files=None, timeout=REQUEST_TIMEOUT):
     """Make API request with error handling."""
     url = f"{API_BASE_URL}/{endpoint}"
     
     try:
         if method == "GET":
-            response = requests.get(url)
+            response = SESSION.get(url, timeout=timeout)
         elif method == "POST":
             if files:
-                response = requests.post(url, data=data, files=files)
+                # Build the multipart body lazily as the socket drains instead of copying the file into memory
+                encoder = MultipartEncoder(fields={**(data or {}), **files})
+                response = SESSION.post(
+                    url, data=encoder, headers={'Content-Type': encoder.content_type}, timeout=timeout
+                )
             else:
-                response = requests.post(url, json=data)
+                response = SESSION.post(url, json=data, timeout=timeout)
         
-        return response.json() if response.content else {}, response.status_code
+        return json_loads(response.content) if response.content else {}, response.status_code
+    except requests.exceptions.Timeout as e:
+        return {"error": f"Request timed out: {str(e)}"}, 504
     except requests.exceptions.RequestException as e:
         return {"error": f"Connection error: {str(e)}"}, 500
     except json.JSONDecodeError:
         return {"error": "Invalid response format"}, 500
 
+def make_paginated_request(endpoint, key):
+    """Fetch every page of a paginated list endpoint and merge the rows under the given key."""
+    items = []
+    next_endpoint = f"{endpoint}?limit={LIST_PAGE_LIMIT}"
+    
+    while next_endpoint:
+        response_data, status_code = make_request(next_endpoint)
+        if status_code != 200:
+            return response_data, status_code
+        
+        items.extend(response_data.get(key, []))
+        next_link = response_data.get('next')
+        next_endpoint = f"{endpoint}?{urlparse(next_link).query}" if next_link else None
+    
+    return {key: items, 'count': len(items)}, 200
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_get(endpoint, key):
+    """Fetch a paginated list endpoint, reusing the result for 30s across page switches."""
+    return make_paginated_request(endpoint, key)
+
+@st.cache_data(show_spinner=False)
+def cached_raw_text(receipt_id):
+    """Fetch a receipt's raw OCR text once; it never changes after processing."""
+    detail_data, detail_status = make_request(f"receipts/{receipt_id}/?include=raw_text")
+    return detail_data.get('receipt', {}).get('raw_text') if detail_status == 200 else None
+
+@st.cache_data(ttl=30, show_spinner=False)
+def receipts_frame():
+    """Receipt listing as a DataFrame, built once per cached fetch for client-side filtering."""
+    response_data, _ = cached_get("receipts/", "receipts")
+    return pd.DataFrame(response_data.get('receipts', []))
+
+@st.cache_data(ttl=30, show_spinner=False)
+def file_stats():
+    """Count total, valid and processed receipt files, or None if the listing failed."""
+    response_data, status_code = cached_get("receipt-files/", "receipt_files")
+    if status_code != 200:
+        return None
+    
+    files_df = pd.DataFrame(response_data.get('receipt_files', []), columns=['is_valid', 'is_processed'])
+    counts = files_df.fillna(False).astype(bool).sum()
+    return {
+        'total': len(files_df),
+        'valid': int(counts['is_valid']),
+        'processed': int(counts['is_processed'])
+    }
+
+@st.cache_data(ttl=30, show_spinner=False)
+def receipt_stats():
+    """Count receipts and sum their totals, or None if the listing failed."""
+    response_data, status_code = cached_get("receipts/", "receipts")
+    if status_code != 200:
+        return None
+    
+    receipts_df = pd.DataFrame(response_data.get('receipts', []), columns=['total_amount'])
+    total_amount = float(pd.to_numeric(receipts_df['total_amount'], errors='coerce').sum())
+    return {
+        'total': len(receipts_df),
+        'total_amount': total_amount,
+        'average_amount': total_amount / len(receipts_df) if len(receipts_df) else 0
+    }
+
+if st.sidebar.button("🔄 Refresh"):
+    st.cache_data.clear()
+
+def wait_for_processed_receipt(task_id):
+    """Poll a queued processing task until the background worker finishes, then fetch the receipt."""
+    for _ in range(PROCESS_POLL_ATTEMPTS):
+        time.sleep(PROCESS_POLL_INTERVAL)
+        status_data, status_code = make_request(f"receipts/status/{task_id}/")
+        if status_code != 200:
+            return status_data
+        
+        if status_data.get('status') == 'SUCCESS':
+            result = status_data.get('result') or {}
+            if 'receipt_id' not in result:
+                return {"error": result.get('error', 'Unknown error')}
+            receipt_data, _ = make_request(f"receipts/{result['receipt_id']}/?include=raw_text")
+            return receipt_data
+        if status_data.get('status') == 'FAILURE':
+            return {"error": status_data.get('error', 'Unknown error')}
+    
+    return {"error": "Receipt is still processing. Check the Receipt Files page later."}
+
+# API values arrive as strings (or None), so they are hashable cache keys as-is
+@lru_cache(maxsize=4096)
 def format_currency(amount):
     """Format currency amount."""
     if amount is None:
         return "N/A"
     return f"${float(amount):,.2f}"
 
+def format_currency_series(amounts):
+    """Format a column of amounts as currency in one pass, with "N/A" for missing values."""
+    values = pd.to_numeric(amounts, errors='coerce')
+    return values.map("${:,.2f}".format).where(values.notna(), "N/A")
+
+@lru_cache(maxsize=4096)
 def format_datetime(dt_str):
     """Format datetime string."""
     if not dt_str:
         return "N/A"
+    # Backend timestamps are ISO 8601; slicing keeps their wall-clock time just as
+    # strftime would, without building a datetime
+    if len(dt_str) >= 19 and dt_str[10] in ('T', ' '):
+        return dt_str[:10] + ' ' + dt_str[11:19]
     try:
         dt = datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
         return dt.strftime("%Y-%m-%d %H:%M:%S")
     except:
         return dt_str
 
+def show_processing_result(response_data):
+    """Render a processed receipt, or the processing error, on the Upload page."""
+    if 'receipt' in response_data:
+        # New receipt stored; drop cached listings and stats so other pages show it
+        st.cache_data.clear()
+        st.markdown(f"""
+        <div class="success-message">
+            <strong>✅ AI Processing Successful!</strong><br>
+            Receipt has been processed with Gemini AI and saved to database.
+            <div class="gemini-badge">🤖 Processed with Google Gemini AI</div>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Display processed receipt
+        receipt = response_data['receipt']
+        st.subheader("📋 AI-Processed Receipt")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown(f"""
+            <div class="receipt-card">
+                <h4>🏪 Merchant Information</h4>
+                <p><strong>Name:</strong> {receipt.get('merchant_name', 'N/A')}</p>
+                <p><strong>Date:</strong> {format_datetime(receipt.get('purchased_at'))}</p>
+                <p><strong>Receipt #:</strong> {receipt.get('receipt_number', 'N/A')}</p>
+                <p><strong>Cashier:</strong> {receipt.get('cashier', 'N/A')}</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown(f"""
+            <div class="receipt-card">
+                <h4>💰 Amount Details</h4>
+                <p><strong>Subtotal:</strong> {format_currency(receipt.get('subtotal'))}</p>
+                <p><strong>Tax:</strong> {format_currency(receipt.get('tax_amount'))}</p>
+                <p><strong>Tip:</strong> {format_currency(receipt.get('tip_amount'))}</p>
+                <p><strong>Total:</strong> {format_currency(receipt.get('total_amount'))}</p>
+                <p><strong>Payment:</strong> {receipt.get('payment_method', 'N/A')}</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        # Display items if available
+        if receipt.get('items'):
+            st.subheader("🛍️ Items Detected by AI")
+            items_df = pd.DataFrame(receipt['items'])
+            if 'unit_price' in items_df.columns:
+                items_df['unit_price'] = format_currency_series(items_df['unit_price'])
+            if 'total_price' in items_df.columns:
+                items_df['total_price'] = format_currency_series(items_df['total_price'])
+            st.dataframe(items_df, use_container_width=True)
+        
+        # Display raw text
+        if receipt.get('raw_text'):
+            with st.expander("📝 Raw Extracted Text (OCR)"):
+                st.text_area("OCR Text", receipt['raw_text'], height=200)
+    else:
+        st.markdown(f"""
+        <div class="error-message">
+            <strong>❌ AI Processing Failed!</strong><br>
+            {response_data.get('error', 'Unknown error')}
+        </div>
+        """, unsafe_allow_html=True)
+
 # Upload Receipt Page
 if page == "📤 Upload Receipt":
     st.header("Upload Receipt")
@@ -153,10 +303,10 @@ if page == "📤 Upload Receipt":
         <h3>📋 AI-Powered Upload Process</h3>
         <p>Follow these steps to process your receipt with advanced AI:</p>
         <ol>
-            <li><strong>Upload</strong> your PDF receipt file</li>
-            <li><strong>Validate</strong> the file format</li>
-            <li><strong>Process</strong> with OCR + Gemini AI to extract structured information</li>
+            <li><strong>Select</strong> your PDF receipt file</li>
+            <li><strong>Upload &amp; Process</strong> it in one step with OCR + Gemini AI to extract structured information</li>
         </ol>
+        <p>The individual upload, validate and process steps are still available under <em>Step-by-step processing</em>.</p>
         <div class="gemini-badge">🤖 Enhanced with Google Gemini AI for superior accuracy</div>
     </div>
     """, unsafe_allow_html=True)
@@ -171,16 +321,38 @@ if page == "📤 Upload Receipt":
     if uploaded_file is not None:
         st.success(f"✅ File selected: {uploaded_file.name} ({uploaded_file.size:,} bytes)")
         
-        col1, col2, col3 = st.columns(3)
+        # Keep one copy of the selected file's bytes for every upload button and retry;
+        # file_id changes whenever a new file is picked, even one with the same name and size
+        if st.session_state.get('file_key') != uploaded_file.file_id:
+            st.session_state['file_key'] = uploaded_file.file_id
+            st.session_state['file_name'] = uploaded_file.name
+            st.session_state['file_bytes'] = uploaded_file.getvalue()
+        files = {'file': (st.session_state['file_name'], st.session_state['file_bytes'], 'application/pdf')}
+        
+        if st.button("🚀 Upload & Process", type="primary"):
+            with st.spinner("Uploading and processing receipt with OCR + Gemini AI..."):
+                response_data, status_code = make_request(
+                    "upload-and-process/", "POST", files=files, timeout=PROCESS_REQUEST_TIMEOUT
+                )
+                
+                if status_code == 202:
+                    st.session_state['uploaded_file_id'] = response_data['file_id']
+                    response_data = wait_for_processed_receipt(response_data['task_id'])
+                
+                show_processing_result(response_data)
+        
+        step_by_step = st.expander("⚙️ Step-by-step processing")
+        col1, col2, col3 = step_by_step.columns(3)
         
         with col1:
-            if st.button("📤 Upload File", type="primary"):
+            if st.button("📤 Upload File"):
                 with st.spinner("Uploading file..."):
-                    files = {'file': uploaded_file}
                     response_data, status_code = make_request("upload/", "POST", files=files)
                     
                     if status_code == 201:
                         st.session_state['uploaded_file_id'] = response_data['file_id']
+                        # Uploads are checked for a PDF header server-side, so they can go straight to processing
+                        st.session_state['file_validated'] = response_data.get('is_valid', False)
                         st.markdown(f"""
                         <div class="success-message">
                             <strong>✅ Upload Successful!</strong><br>
@@ -224,75 +396,22 @@ if page == "📤 Upload Receipt":
         with col3:
             if st.button("🤖 Process with AI") and st.session_state.get('file_validated', False):
                 with st.spinner("Processing receipt with OCR + Gemini AI..."):
-                    data = {'file_id': st.session_state['uploaded_file_id']}
-                    response_data, status_code = make_request("process/", "POST", data)
+                    file_id = st.session_state['uploaded_file_id']
+                    response_data, status_code = make_request(
+                        "process/", "POST", {'file_id': file_id}, timeout=PROCESS_REQUEST_TIMEOUT
+                    )
                     
-                    if status_code == 200:
-                        st.markdown(f"""
-                        <div class="success-message">
-                            <strong>✅ AI Processing Successful!</strong><br>
-                            Receipt has been processed with Gemini AI and saved to database.
-                            <div class="gemini-badge">🤖 Processed with Google Gemini AI</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        # Display processed receipt
-                        receipt = response_data['receipt']
-                        st.subheader("📋 AI-Processed Receipt")
-                        
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.markdown(f"""
-                            <div class="receipt-card">
-                                <h4>🏪 Merchant Information</h4>
-                                <p><strong>Name:</strong> {receipt.get('merchant_name', 'N/A')}</p>
-                                <p><strong>Date:</strong> {format_datetime(receipt.get('purchased_at'))}</p>
-                                <p><strong>Receipt #:</strong> {receipt.get('receipt_number', 'N/A')}</p>
-                                <p><strong>Cashier:</strong> {receipt.get('cashier', 'N/A')}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        with col2:
-                            st.markdown(f"""
-                            <div class="receipt-card">
-                                <h4>💰 Amount Details</h4>
-                                <p><strong>Subtotal:</strong> {format_currency(receipt.get('subtotal'))}</p>
-                                <p><strong>Tax:</strong> {format_currency(receipt.get('tax_amount'))}</p>
-                                <p><strong>Tip:</strong> {format_currency(receipt.get('tip_amount'))}</p>
-                                <p><strong>Total:</strong> {format_currency(receipt.get('total_amount'))}</p>
-                                <p><strong>Payment:</strong> {receipt.get('payment_method', 'N/A')}</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        # Display items if available
-                        if receipt.get('items'):
-                            st.subheader("🛍️ Items Detected by AI")
-                            items_df = pd.DataFrame(receipt['items'])
-                            if 'unit_price' in items_df.columns:
-                                items_df['unit_price'] = items_df['unit_price'].apply(lambda x: format_currency(x) if x is not None else 'N/A')
-                            if 'total_price' in items_df.columns:
-                                items_df['total_price'] = items_df['total_price'].apply(lambda x: format_currency(x) if x is not None else 'N/A')
-                            st.dataframe(items_df, use_container_width=True)
-                        
-                        # Display raw text
-                        if receipt.get('raw_text'):
-                            with st.expander("📝 Raw Extracted Text (OCR)"):
-                                st.text_area("OCR Text", receipt['raw_text'], height=200)
-                    else:
-                        st.markdown(f"""
-                        <div class="error-message">
-                            <strong>❌ AI Processing Failed!</strong><br>
-                            {response_data.get('error', 'Unknown error')}
-                        </div>
-                        """, unsafe_allow_html=True)
+                    if status_code == 202:
+                        response_data = wait_for_processed_receipt(response_data['task_id'])
+                    
+                    show_processing_result(response_data)
 
 # View Receipts Page
 elif page == "📊 View Receipts":
     st.header("View Receipts")
     
     # Fetch receipts
-    response_data, status_code = make_request("receipts/")
+    response_data, status_code = cached_get("receipts/", "receipts")
     
     if status_code == 200:
         receipts = response_data.get('receipts', [])
@@ -306,51 +425,73 @@ elif page == "📊 View Receipts":
             </div>
             """, unsafe_allow_html=True)
             
-            # Search and filter
-            search_term = st.text_input("🔍 Search receipts by merchant name", "")
+            # Search and filter; the form only reruns the page when the search is submitted, not per keystroke
+            with st.form("search_form"):
+                search_term = st.text_input("🔍 Search receipts by merchant name", "")
+                st.form_submit_button("Search")
             
             # Filter receipts
             filtered_receipts = receipts
             if search_term:
-                filtered_receipts = [r for r in receipts if search_term.lower() in r.get('merchant_name', '').lower()]
+                receipts_df = receipts_frame()
+                mask = receipts_df['merchant_name'].fillna('').str.contains(search_term, case=False, regex=False)
+                filtered_receipts = receipts_df[mask].to_dict('records')
             
-            # Display receipts
-            for receipt in filtered_receipts:
-                with st.expander(f"🏪 {receipt.get('merchant_name', 'Unknown')} - {format_currency(receipt.get('total_amount'))} - {format_datetime(receipt.get('purchased_at'))}"):
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown(f"""
-                        **Receipt ID:** {receipt.get('id')}  
-                        **Merchant:** {receipt.get('merchant_name', 'N/A')}  
-                        **Date:** {format_datetime(receipt.get('purchased_at'))}  
-                        **Receipt #:** {receipt.get('receipt_number', 'N/A')}  
-                        **Cashier:** {receipt.get('cashier', 'N/A')}  
-                        """)
-                    
-                    with col2:
-                        st.markdown(f"""
-                        **Subtotal:** {format_currency(receipt.get('subtotal'))}  
-                        **Tax:** {format_currency(receipt.get('tax_amount'))}  
-                        **Tip:** {format_currency(receipt.get('tip_amount'))}  
-                        **Total:** {format_currency(receipt.get('total_amount'))}  
-                        **Payment:** {receipt.get('payment_method', 'N/A')}  
-                        """)
-                    
-                    # Display items
-                    if receipt.get('items'):
-                        st.subheader("🛍️ Items (AI Extracted)")
-                        items_df = pd.DataFrame(receipt['items'])
-                        if 'unit_price' in items_df.columns:
-                            items_df['unit_price'] = items_df['unit_price'].apply(lambda x: format_currency(x) if x is not None else 'N/A')
-                        if 'total_price' in items_df.columns:
-                            items_df['total_price'] = items_df['total_price'].apply(lambda x: format_currency(x) if x is not None else 'N/A')
-                        st.dataframe(items_df, use_container_width=True)
-                    
-                    # Raw text toggle
-                    if st.button(f"Toggle Raw Text", key=f"raw_{receipt.get('id')}"):
-                        if receipt.get('raw_text'):
-                            st.text_area("Raw OCR Text", receipt['raw_text'], height=150, key=f"text_{receipt.get('id')}")
+            # One summary table for every match; details are rendered for a single receipt on demand
+            if filtered_receipts:
+                summary_df = pd.DataFrame(filtered_receipts).reindex(
+                    columns=['id', 'merchant_name', 'purchased_at', 'total_amount', 'payment_method', 'receipt_number']
+                )
+                summary_df['purchased_at'] = summary_df['purchased_at'].map(format_datetime)
+                summary_df['total_amount'] = format_currency_series(summary_df['total_amount'])
+                st.dataframe(summary_df, use_container_width=True, hide_index=True)
+                
+                receipts_by_id = {receipt['id']: receipt for receipt in filtered_receipts}
+                selected_id = st.selectbox(
+                    "Receipt to inspect",
+                    list(receipts_by_id),
+                    format_func=lambda receipt_id: f"#{receipt_id} - {receipts_by_id[receipt_id].get('merchant_name') or 'Unknown'}"
+                )
+                receipt = receipts_by_id[selected_id]
+                st.subheader(f"🏪 {receipt.get('merchant_name', 'Unknown')} - {format_currency(receipt.get('total_amount'))} - {format_datetime(receipt.get('purchased_at'))}")
+                
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown(f"""
+                    **Receipt ID:** {receipt.get('id')}  
+                    **Merchant:** {receipt.get('merchant_name', 'N/A')}  
+                    **Date:** {format_datetime(receipt.get('purchased_at'))}  
+                    **Receipt #:** {receipt.get('receipt_number', 'N/A')}  
+                    **Cashier:** {receipt.get('cashier', 'N/A')}  
+                    """)
+                
+                with col2:
+                    st.markdown(f"""
+                    **Subtotal:** {format_currency(receipt.get('subtotal'))}  
+                    **Tax:** {format_currency(receipt.get('tax_amount'))}  
+                    **Tip:** {format_currency(receipt.get('tip_amount'))}  
+                    **Total:** {format_currency(receipt.get('total_amount'))}  
+                    **Payment:** {receipt.get('payment_method', 'N/A')}  
+                    """)
+                
+                # Display items
+                if receipt.get('items'):
+                    st.subheader("🛍️ Items (AI Extracted)")
+                    items_df = pd.DataFrame(receipt['items'])
+                    if 'unit_price' in items_df.columns:
+                        items_df['unit_price'] = format_currency_series(items_df['unit_price'])
+                    if 'total_price' in items_df.columns:
+                        items_df['total_price'] = format_currency_series(items_df['total_price'])
+                    st.dataframe(items_df, use_container_width=True)
+                
+                # Raw text is not included in the list response, so it is only fetched while the toggle is on
+                if st.toggle("Show raw OCR text", key=f"raw_{receipt.get('id')}"):
+                    raw_text = cached_raw_text(receipt.get('id'))
+                    if raw_text:
+                        st.text_area("Raw OCR Text", raw_text, height=150, key=f"text_{receipt.get('id')}")
+            else:
+                st.info("🔍 No receipts match your search.")
         else:
             st.info("📭 No receipts found. Upload and process some receipts to see them here.")
     else:
@@ -361,7 +502,7 @@ elif page == "📋 Receipt Files":
     st.header("Receipt Files")
     
     # Fetch receipt files
-    response_data, status_code = make_request("receipt-files/")
+    response_data, status_code = cached_get("receipt-files/", "receipt_files")
     
     if status_code == 200:
         receipt_files = response_data.get('receipt_files', [])
@@ -374,51 +515,57 @@ elif page == "📋 Receipt Files":
             </div>
             """, unsafe_allow_html=True)
             
-            # Create DataFrame for better display
-            file_data = []
-            for file in receipt_files:
-                file_data.append({
-                    'ID': file.get('id'),
-                    'File Name': file.get('file_name'),
-                    'Valid': '✅' if file.get('is_valid') else '❌',
-                    'AI Processed': '✅' if file.get('is_processed') else '❌',
-                    'Uploaded': format_datetime(file.get('created_at')),
-                    'Invalid Reason': file.get('invalid_reason', 'N/A')
-                })
-            
-            df = pd.DataFrame(file_data)
+            # Build the summary table column-wise straight from the API rows
+            files_df = pd.DataFrame(receipt_files)
+            uploaded = pd.to_datetime(files_df['created_at'], utc=True, errors='coerce').dt.strftime("%Y-%m-%d %H:%M:%S")
+            unparsed = uploaded.isna()
+            uploaded[unparsed] = files_df.loc[unparsed, 'created_at'].map(format_datetime)
+            df = pd.DataFrame({
+                'ID': files_df['id'],
+                'File Name': files_df['file_name'],
+                'Valid': np.where(files_df['is_valid'], '✅', '❌'),
+                'AI Processed': np.where(files_df['is_processed'], '✅', '❌'),
+                'Uploaded': uploaded,
+                'Invalid Reason': files_df['invalid_reason'].fillna('N/A')
+            })
             st.dataframe(df, use_container_width=True)
             
-            # Detailed view
+            # Detailed view, rendered for one file at a time
             st.subheader("📋 Detailed File Information")
-            for file in receipt_files:
-                with st.expander(f"📄 {file.get('file_name')} (ID: {file.get('id')})"):
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        st.markdown(f"""
-                        **File ID:** {file.get('id')}  
-                        **File Name:** {file.get('file_name')}  
-                        **File Path:** {file.get('file_path')}  
-                        **Uploaded:** {format_datetime(file.get('created_at'))}  
-                        **Updated:** {format_datetime(file.get('updated_at'))}  
-                        """)
-                    
-                    with col2:
-                        valid_status = "✅ Valid" if file.get('is_valid') else "❌ Invalid"
-                        processed_status = "✅ AI Processed" if file.get('is_processed') else "❌ Not Processed"
-                        
-                        st.markdown(f"""
-                        **Status:** {valid_status}  
-                        **AI Processing:** {processed_status}  
-                        **Invalid Reason:** {file.get('invalid_reason', 'N/A')}  
-                        """)
-                    
-                    # Show associated receipts
-                    if file.get('receipts'):
-                        st.subheader("Associated AI-Processed Receipts")
-                        for receipt in file['receipts']:
-                            st.markdown(f"• {receipt.get('merchant_name', 'Unknown')} - {format_currency(receipt.get('total_amount'))}")
+            files_by_id = {file['id']: file for file in receipt_files}
+            selected_id = st.selectbox(
+                "Inspect file",
+                list(files_by_id),
+                format_func=lambda file_id: f"📄 {files_by_id[file_id].get('file_name')} (ID: {file_id})"
+            )
+            file = files_by_id[selected_id]
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.markdown(f"""
+                **File ID:** {file.get('id')}  
+                **File Name:** {file.get('file_name')}  
+                **File Path:** {file.get('file_path')}  
+                **Uploaded:** {format_datetime(file.get('created_at'))}  
+                **Updated:** {format_datetime(file.get('updated_at'))}  
+                """)
+            
+            with col2:
+                valid_status = "✅ Valid" if file.get('is_valid') else "❌ Invalid"
+                processed_status = "✅ AI Processed" if file.get('is_processed') else "❌ Not Processed"
+                
+                st.markdown(f"""
+                **Status:** {valid_status}  
+                **AI Processing:** {processed_status}  
+                **Invalid Reason:** {file.get('invalid_reason', 'N/A')}  
+                """)
+            
+            # Show associated receipts
+            if file.get('receipts'):
+                st.subheader("Associated AI-Processed Receipts")
+                for receipt in file['receipts']:
+                    st.markdown(f"• {receipt.get('merchant_name', 'Unknown')} - {format_currency(receipt.get('total_amount'))}")
         else:
             st.info("📭 No files found. Upload some receipt files to see them here.")
     else:
@@ -428,8 +575,18 @@ elif page == "📋 Receipt Files":
 elif page == "🔍 System Status":
     st.header("System Status")
     
+    # The health and statistics lookups are independent, so fetch them concurrently;
+    # the workers get this run's script context so the cached stats helpers work in them
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(
+        max_workers=3, initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)
+    ) as executor:
+        health_future = executor.submit(make_request, "health/")
+        files_future = executor.submit(file_stats)
+        receipts_future = executor.submit(receipt_stats)
+    
     # Health check
-    response_data, status_code = make_request("health/")
+    response_data, status_code = health_future.result()
     
     if status_code == 200:
         st.markdown(f"""
@@ -454,34 +611,27 @@ elif page == "🔍 System Status":
     
     with col1:
         # Get receipt files stats
-        response_data, status_code = make_request("receipt-files/")
-        if status_code == 200:
-            files = response_data.get('receipt_files', [])
-            valid_files = sum(1 for f in files if f.get('is_valid'))
-            processed_files = sum(1 for f in files if f.get('is_processed'))
-            
+        stats = files_future.result()
+        if stats is not None:
             st.markdown(f"""
             <div class="stat-card">
                 <h4>📁 File Statistics</h4>
-                <p><strong>Total Files:</strong> {len(files)}</p>
-                <p><strong>Valid Files:</strong> {valid_files}</p>
-                <p><strong>AI Processed Files:</strong> {processed_files}</p>
+                <p><strong>Total Files:</strong> {stats['total']}</p>
+                <p><strong>Valid Files:</strong> {stats['valid']}</p>
+                <p><strong>AI Processed Files:</strong> {stats['processed']}</p>
             </div>
             """, unsafe_allow_html=True)
     
     with col2:
         # Get receipts stats
-        response_data, status_code = make_request("receipts/")
-        if status_code == 200:
-            receipts = response_data.get('receipts', [])
-            total_amount = sum(float(r.get('total_amount', 0)) for r in receipts if r.get('total_amount'))
-            
+        stats = receipts_future.result()
+        if stats is not None:
             st.markdown(f"""
             <div class="stat-card">
                 <h4>🧾 Receipt Statistics</h4>
-                <p><strong>Total Receipts:</strong> {len(receipts)}</p>
-                <p><strong>Total Amount:</strong> {format_currency(total_amount)}</p>
-                <p><strong>Average Amount:</strong> {format_currency(total_amount / len(receipts) if receipts else 0)}</p>
+                <p><strong>Total Receipts:</strong> {stats['total']}</p>
+                <p><strong>Total Amount:</strong> {format_currency(stats['total_amount'])}</p>
+                <p><strong>Average Amount:</strong> {format_currency(stats['average_amount'])}</p>
             </div>
             """, unsafe_allow_html=True)
     
@@ -489,11 +639,15 @@ elif page == "🔍 System Status":
     st.subheader("🔗 API Endpoints")
     endpoints = [
         ("POST", "/api/upload/", "Upload receipt file"),
+        ("POST", "/api/upload-and-process/", "Upload a receipt and queue it for processing in one request"),
         ("POST", "/api/validate/", "Validate PDF file"),
-        ("POST", "/api/process/", "Process receipt with OCR + Gemini AI"),
+        ("POST", "/api/process/", "Queue receipt for OCR + Gemini AI processing"),
         ("GET", "/api/receipts/", "List all receipts"),
+        ("GET", "/api/receipts/export/", "Stream all receipts as JSON lines"),
         ("GET", "/api/receipts/{id}/", "Get specific receipt"),
         ("GET", "/api/receipt-files/", "List all receipt files"),
+        ("GET", "/api/receipt-files/{id}/", "Get receipt file details"),
+        ("GET", "/api/receipts/status/{task_id}/", "Get background processing task status"),
         ("GET", "/api/health/", "Health check"),
     ]
     